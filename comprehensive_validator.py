@@ -2,9 +2,12 @@
 """Comprehensive validation between parser output and golden CSV"""
 
 import csv
-from difflib import SequenceMatcher
 from pathlib import Path
 
+import numpy as np
+from rapidfuzz import fuzz, process
+from scipy.optimize import linear_sum_assignment
+
 
 def load_csv(path):
     """Load CSV into list of dicts"""
@@ -20,60 +23,70 @@ def normalize_amount(amount_str):
     # Convert comma decimal to dot decimal
     return float(amount_str.replace(',', '.'))
 
-def similarity(a, b):
-    """Calculate similarity between two strings"""
-    return SequenceMatcher(None, a.upper(), b.upper()).ratio()
+def description_similarities(parser_data, golden_data):
+    """Case-insensitive 0-1 description similarity matrix"""
+    p_descs = [row['desc_raw'].upper() for row in parser_data]
+    g_descs = [row['desc_raw'].upper() for row in golden_data]
+    scores = process.cdist(
+        p_descs, g_descs, scorer=fuzz.ratio, dtype=np.float64, workers=-1
+    )
+    return scores / 100.0
+
+def parse_amounts(rows):
+    """Amounts as a float array; unparseable values become NaN"""
+    amounts = np.full(len(rows), np.nan)
+    for i, row in enumerate(rows):
+        try:
+            amounts[i] = normalize_amount(row['amount_brl'])
+        except (KeyError, ValueError):
+            pass
+    return amounts
+
+def score_matrix(parser_data, golden_data):
+    """Combined match score of every parser/golden pair as an N x M matrix"""
+    # Description similarity (most important)
+    scores = description_similarities(parser_data, golden_data) * 0.5
+
+    # Amount similarity, only when both amounts are positive
+    p_amounts = parse_amounts(parser_data)[:, None]
+    g_amounts = parse_amounts(golden_data)[None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        amount_diff = np.abs(p_amounts - g_amounts) / np.maximum(p_amounts, g_amounts)
+    amount_sim = np.maximum(0, 1 - amount_diff)
+    scores += np.where((p_amounts > 0) & (g_amounts > 0), amount_sim * 0.3, 0.0)
+
+    # Date similarity
+    p_dates = np.array([row['post_date'] for row in parser_data], dtype=object)[:, None]
+    g_dates = np.array([row['post_date'] for row in golden_data], dtype=object)[None, :]
+    scores += np.where(p_dates == g_dates, 0.2, 0.0)
+
+    return scores
 
 def find_best_matches(parser_data, golden_data):
     """Find best matches between parser and golden data"""
     matches = []
-    used_golden = set()
-
-    for p_idx, p_row in enumerate(parser_data):
-        best_match = None
-        best_score = 0
-        best_g_idx = -1
-
-        for g_idx, g_row in enumerate(golden_data):
-            if g_idx in used_golden:
-                continue
-
-            # Calculate match score based on multiple factors
-            score = 0
-
-            # Description similarity (most important)
-            desc_sim = similarity(p_row['desc_raw'], g_row['desc_raw'])
-            score += desc_sim * 0.5
-
-            # Amount similarity
-            try:
-                p_amount = normalize_amount(p_row['amount_brl'])
-                g_amount = normalize_amount(g_row['amount_brl'])
-                if p_amount > 0 and g_amount > 0:
-                    amount_diff = abs(p_amount - g_amount) / max(p_amount, g_amount)
-                    amount_sim = max(0, 1 - amount_diff)
-                    score += amount_sim * 0.3
-            except:
-                pass
-
-            # Date similarity
-            if p_row['post_date'] == g_row['post_date']:
-                score += 0.2
-
-            if score > best_score and score > 0.3:  # Minimum threshold
-                best_score = score
-                best_match = g_row
-                best_g_idx = g_idx
-
-        if best_match:
-            matches.append({
-                'parser_idx': p_idx,
-                'golden_idx': best_g_idx,
-                'parser_row': p_row,
-                'golden_row': best_match,
-                'score': best_score
-            })
-            used_golden.add(best_g_idx)
+    if not parser_data or not golden_data:
+        return matches
+
+    # One-to-one assignment (each golden row matched once) maximising the
+    # total over pairs above the minimum threshold; sub-threshold cells are
+    # zeroed so they cannot displace a pair that would be reported
+    scores = score_matrix(parser_data, golden_data)
+    scores = np.where(scores > 0.3, scores, 0.0)
+    p_indices, g_indices = linear_sum_assignment(scores, maximize=True)
+
+    for p_idx, g_idx in zip(p_indices.tolist(), g_indices.tolist(), strict=True):
+        score = scores[p_idx, g_idx]
+        if score <= 0.3:  # Minimum threshold
+            continue
+
+        matches.append({
+            'parser_idx': p_idx,
+            'golden_idx': g_idx,
+            'parser_row': parser_data[p_idx],
+            'golden_row': golden_data[g_idx],
+            'score': float(score)
+        })
 
     return matches
 
@@ -83,8 +96,7 @@ def analyze_matches(matches):
         print("No matches found!")
         return
 
-    print(f"Found {len(matches)} matches")
-    print("\n=== TOP 10 MATCHES ===")
+    report = [f"Found {len(matches)} matches", "\n=== TOP 10 MATCHES ==="]
 
     # Sort by score
     matches.sort(key=lambda x: x['score'], reverse=True)
@@ -103,9 +115,9 @@ def analyze_matches(matches):
         g_row = match['golden_row']
         score = match['score']
 
-        print(f"\nMatch {i+1} (Score: {score:.3f}):")
-        print(f"  Parser: {p_row['desc_raw'][:60]}...")
-        print(f"  Golden: {g_row['desc_raw'][:60]}...")
+        report.append(f"\nMatch {i+1} (Score: {score:.3f}):")
+        report.append(f"  Parser: {p_row['desc_raw'][:60]}...")
+        report.append(f"  Golden: {g_row['desc_raw'][:60]}...")
 
         # Check field-by-field matches
         for field in field_matches.keys():
@@ -120,23 +132,29 @@ def analyze_matches(matches):
 
                 if match_field:
                     field_matches[field] += 1
-                    print(f"    ✅ {field}: {p_row[field]}")
+                    report.append(f"    ✅ {field}: {p_row[field]}")
                 else:
-                    print(f"    ❌ {field}: {p_row[field]} vs {g_row[field]}")
+                    report.append(f"    ❌ {field}: {p_row[field]} vs {g_row[field]}")
 
     # Overall statistics
     total_matches = len(matches)
-    print("\n=== OVERALL FIELD ACCURACY ===")
+    report.append("\n=== OVERALL FIELD ACCURACY ===")
     for field, count in field_matches.items():
         accuracy = (count / total_matches) * 100 if total_matches > 0 else 0
-        print(f"{field}: {count}/{total_matches} ({accuracy:.1f}%)")
+        report.append(f"{field}: {count}/{total_matches} ({accuracy:.1f}%)")
 
     # Calculate overall accuracy
     total_possible = total_matches * len(field_matches)
     total_correct = sum(field_matches.values())
     overall_accuracy = (total_correct / total_possible) * 100 if total_possible > 0 else 0
 
-    print(f"\nOVERALL ACCURACY: {total_correct}/{total_possible} ({overall_accuracy:.1f}%)")
+    report.append(
+        f"\nOVERALL ACCURACY: {total_correct}/{total_possible} "
+        f"({overall_accuracy:.1f}%)"
+    )
+
+    # One write for the whole report instead of a print() per line
+    print("\n".join(report))
 
 def main():
     import sys
@@ -18,6 +18,8 @@ Version: 1.0.0
 """
 
 import logging
+import multiprocessing
+import os
 import re
 import csv
 import hashlib
@@ -27,10 +29,15 @@ from pathlib import Path
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, date
 from typing import Dict, List, Optional, Tuple, Iterator
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import pdfplumber
 
+try:  # optional Aho-Corasick automaton: pip install pyahocorasick
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,6 +53,9 @@ DEFAULT_SCHEMA = [
     "category", "merchant_city", "ledger_hash", "prev_bill_amount",
     "interest_amount", "amount_orig", "currency_orig", "amount_usd"
 ]
+PUA_PATTERN = re.compile(r'[\ue000-\uf8ff]')
+MULTISPACE_PATTERN = re.compile(r'\s{2,}')
+CENTS = Decimal('0.01')
 
 class TransactionType(Enum):
     """Transaction type enumeration for better type safety."""
@@ -57,7 +67,7 @@ class TransactionType(Enum):
     INTEREST = "interest"
     FEE = "fee"
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     """Structured transaction data with validation."""
     card_last4: str
@@ -125,6 +135,7 @@ class ConfigManager:
                 'date_formats': ['%d/%m/%Y', '%d/%m', '%Y-%m-%d'],
                 'default_year': datetime.now().year,
                 'amount_tolerance': 0.01,
+                'workers': None,  # PDF page processes (1 = serial)
                 'card_patterns': [
                     r'final (\d{4})',
                     r'cart[ãa]o.*?(\d{4})',
@@ -182,11 +193,18 @@ class ConfigManager:
                 return default
         return value
 
+def _extract_page_text(pdf_path: str, page_idx: int) -> Optional[str]:
+    """Extract raw text of a single PDF page (process-pool worker)."""
+    with pdfplumber.open(pdf_path, pages=[page_idx + 1]) as pdf:
+        return pdf.pages[0].extract_text()
+
 class PDFExtractor:
     """Robust PDF text extraction with error handling."""
     
-    def __init__(self, config: ConfigManager):
+    def __init__(self, config: ConfigManager, workers: Optional[int] = None):
         self.config = config
+        # Page processes; 1 keeps extraction serial, None uses one per CPU
+        self.workers = workers if workers is not None else config.get('parsing.workers')
     
     def extract_text(self, pdf_path: Path) -> List[str]:
         """Extract and clean text lines from PDF."""
@@ -197,16 +215,30 @@ class PDFExtractor:
         
         try:
             with pdfplumber.open(str(pdf_path)) as pdf:
-                lines = []
-                for page_num, page in enumerate(pdf.pages, 1):
-                    text = page.extract_text()
-                    if text:
-                        page_lines = self._clean_lines(text.splitlines())
-                        lines.extend(page_lines)
-                        logger.debug(f"Page {page_num}: extracted {len(page_lines)} lines")
-                
-                logger.info(f"Total extracted lines: {len(lines)}")
-                return lines
+                n_pages = len(pdf.pages)
+                workers = min(n_pages, self.workers or os.cpu_count() or 1)
+                if workers <= 1:
+                    texts = []
+                    for page in pdf.pages:
+                        texts.append(page.extract_text())
+                        page.close()  # release per-page object caches
+            
+            if workers > 1:
+                # Pages are independent and pdfminer is CPU-bound: fan out to processes
+                with multiprocessing.Pool(workers) as pool:
+                    texts = pool.starmap(
+                        _extract_page_text, [(str(pdf_path), i) for i in range(n_pages)]
+                    )
+            
+            lines = []
+            for page_num, text in enumerate(texts, 1):
+                if text:
+                    page_lines = self._clean_lines(text.splitlines())
+                    lines.extend(page_lines)
+                    logger.debug(f"Page {page_num}: extracted {len(page_lines)} lines")
+            
+            logger.info(f"Total extracted lines: {len(lines)}")
+            return lines
                 
         except Exception as e:
             logger.error(f"PDF extraction failed: {e}")
@@ -216,12 +248,14 @@ class PDFExtractor:
         """Clean and normalize text lines."""
         cleaned = []
         for line in raw_lines:
-            # Remove Unicode private area characters (icons)
-            line = re.sub(r'[\ue000-\uf8ff]', '', line)
+            # Remove Unicode private area characters (icons); ASCII-only
+            # lines (an O(1) check) cannot contain any
+            if not line.isascii():
+                line = PUA_PATTERN.sub('', line)
             # Remove leading symbols
             line = line.lstrip('>@§$Z)_•*®«» ')
             # Normalize whitespace
-            line = re.sub(r'\s{2,}', ' ', line).strip()
+            line = MULTISPACE_PATTERN.sub(' ', line).strip()
             
             if line:  # Only keep non-empty lines
                 cleaned.append(line)
@@ -235,9 +269,9 @@ class CardNumberExtractor:
         self.config = config
         self.patterns = [re.compile(p) for p in config.get('parsing.card_patterns', [])]
     
-    def extract_card_numbers(self, lines: List[str]) -> Dict[str, str]:
-        """Extract card numbers and create line-to-card mapping."""
-        card_mapping = {}
+    def extract_card_numbers(self, lines: List[str]) -> List[str]:
+        """Extract card numbers and stamp the current card on every line index."""
+        card_mapping = []
         current_card = "0000"  # Fallback
         
         for i, line in enumerate(lines):
@@ -250,10 +284,10 @@ class CardNumberExtractor:
                     break
             
             # Associate this line with current card
-            card_mapping[i] = current_card
+            card_mapping.append(current_card)
         
         # Log statistics
-        unique_cards = set(card_mapping.values())
+        unique_cards = set(card_mapping)
         logger.info(f"Extracted {len(unique_cards)} unique card numbers: {unique_cards}")
         
         return card_mapping
@@ -276,8 +310,72 @@ class TransactionExtractor:
             'fx_rate': re.compile(r'D[óo]lar de Convers[ãa]o.*?(?P<rate>[\d.,]+)'),
             'iof': re.compile(r'Repasse de IOF.*?([\d.,]+)', re.I),
             'installment': re.compile(r'(\d{1,2})/(\d{1,2})'),
-            'amount': re.compile(r'-?\s*\d{1,3}(?:\.\d{3})*,\d{2}')
+            'amount': re.compile(r'-?\s*\d{1,3}(?:\.\d{3})*,\d{2}'),
+            'amount_clean': re.compile(r'[^\d,.-]')
         }
+        
+        # Per-transaction rules, resolved from config once instead of per call
+        self.date_formats = self.config.get(
+            'parsing.date_formats', ['%d/%m/%Y', '%d/%m']
+        )
+        self.default_year = self.config.get(
+            'parsing.default_year', datetime.now().year
+        )
+        self.adj_threshold = self.config.get(
+            'business_rules.adjustment_threshold', 0.30
+        )
+        self.payment_pattern = self._keyword_pattern(
+            self.config.get('business_rules.payment_markers', [])
+        )
+        self.charges_pattern = self._keyword_pattern(
+            self.config.get('business_rules.iof_keywords', [])
+            + self.config.get('business_rules.interest_keywords', [])
+        )
+        # Category keywords ranked by rule order, so a single scan of the
+        # description can still honour "first category in config wins".
+        self.keyword_categories = {}
+        categories = self.config.get('categories', {})
+        for rank, (category, keywords) in enumerate(categories.items()):
+            if category != 'DIVERSOS':
+                for kw in keywords or []:
+                    self.keyword_categories.setdefault(kw, (rank, category))
+        self.category_matcher = self._category_matcher(self.keyword_categories)
+    
+    @staticmethod
+    def _keyword_pattern(keywords: List[str]) -> Optional[re.Pattern]:
+        """Compile keywords into one literal alternation (None if no keywords)."""
+        if not keywords:
+            return None
+        return re.compile('|'.join(re.escape(kw) for kw in keywords))
+    
+    @staticmethod
+    def _category_matcher(keyword_categories: Dict[str, Tuple[int, str]]):
+        """Build a one-pass scanner yielding (rank, category) for every keyword hit."""
+        if not keyword_categories:
+            return None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for kw, rank_category in keyword_categories.items():
+                automaton.add_word(kw, rank_category)
+            automaton.make_automaton()
+
+            def scan_automaton(text: str) -> Iterator[Tuple[int, str]]:
+                for _, rank_category in automaton.iter(text):
+                    yield rank_category
+
+            return scan_automaton
+
+        # Lookahead keeps overlapping hits; at each position the earliest
+        # listed (lowest ranked) keyword is the one reported.
+        pattern = re.compile(
+            '(?=(' + '|'.join(re.escape(kw) for kw in keyword_categories) + '))'
+        )
+
+        def scan_pattern(text: str) -> Iterator[Tuple[int, str]]:
+            for match in pattern.finditer(text):
+                yield keyword_categories[match.group(1)]
+
+        return scan_pattern
     
     def extract_transactions(self, lines: List[str]) -> List[Transaction]:
         """Extract all transactions from text lines."""
@@ -294,33 +392,38 @@ class TransactionExtractor:
                 i += 1
                 continue
             
-            card_last4 = card_mapping.get(i, "0000")
+            card_last4 = card_mapping[i]
             
-            # Try FX parsing (multi-line)
-            fx_result = self._parse_fx_transaction(lines[i:i+3], card_last4)
-            if fx_result:
-                fx_key = (fx_result.desc_raw, fx_result.post_date, fx_result.amount_brl)
-                if fx_key not in seen_fx:
-                    seen_fx.add(fx_key)
-                    transactions.append(fx_result)
-                i += 2  # Skip consumed lines
-                continue
-            
-            # Try payment parsing
-            payment = self._parse_payment(line, card_last4, payment_count)
-            if payment:
-                if not self._should_ignore_payment(payment, payment_count):
-                    transactions.append(payment)
-                payment_count += 1
-                i += 1
-                continue
-            
-            # Try domestic transaction
-            domestic = self._parse_domestic_transaction(line, card_last4)
-            if domestic:
-                transactions.append(domestic)
-                i += 1
-                continue
+            # FX, payment and domestic patterns are all anchored on a DD/MM
+            # date, so only digit-led lines need the matcher battery
+            if line[0].isdigit():
+                # Try FX parsing (multi-line)
+                fx_result = self._parse_fx_transaction(lines[i:i+3], card_last4)
+                if fx_result:
+                    fx_key = (
+                        fx_result.desc_raw, fx_result.post_date, fx_result.amount_brl
+                    )
+                    if fx_key not in seen_fx:
+                        seen_fx.add(fx_key)
+                        transactions.append(fx_result)
+                    i += 2  # Skip consumed lines
+                    continue
+                
+                # Try payment parsing
+                payment = self._parse_payment(line, card_last4, payment_count)
+                if payment:
+                    if not self._should_ignore_payment(payment, payment_count):
+                        transactions.append(payment)
+                    payment_count += 1
+                    i += 1
+                    continue
+                
+                # Try domestic transaction
+                domestic = self._parse_domestic_transaction(line, card_last4)
+                if domestic:
+                    transactions.append(domestic)
+                    i += 1
+                    continue
             
             # Try IOF
             iof = self._parse_iof(line, card_last4)
@@ -436,6 +539,9 @@ class TransactionExtractor:
     
     def _parse_iof(self, line: str, card_last4: str) -> Optional[Transaction]:
         """Parse IOF transaction."""
+        # cheap substring probe before the unanchored, case-insensitive search
+        if 'IOF' not in line.upper():
+            return None
         match = self.patterns['iof'].search(line)
         if not match:
             return None
@@ -464,8 +570,15 @@ class TransactionExtractor:
         if not amount_str:
             return Decimal('0.00')
         
+        # Fast path: an already clean Brazilian amount ("-1.234,56") needs
+        # no regex pass, just the separator swap
+        if ',' in amount_str:
+            fast_str = amount_str.replace('.', '').replace(',', '.')
+            if fast_str.removeprefix('-').replace('.', '', 1).isdecimal():
+                return Decimal(fast_str).quantize(CENTS, rounding=ROUND_HALF_UP)
+        
         # Clean the amount string
-        clean_str = re.sub(r'[^\d,.-]', '', amount_str.strip())
+        clean_str = self.patterns['amount_clean'].sub('', amount_str.strip())
         
         # Handle different formats
         if ',' in clean_str and '.' in clean_str:
@@ -476,7 +589,7 @@ class TransactionExtractor:
             clean_str = clean_str.replace(',', '.')
         
         try:
-            return Decimal(clean_str).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            return Decimal(clean_str).quantize(CENTS, rounding=ROUND_HALF_UP)
         except:
             logger.warning(f"Could not parse amount: {amount_str}")
             return Decimal('0.00')
@@ -486,14 +599,11 @@ class TransactionExtractor:
         if not date_str:
             return ""
         
-        date_formats = self.config.get('parsing.date_formats', ['%d/%m/%Y', '%d/%m'])
-        default_year = self.config.get('parsing.default_year', datetime.now().year)
-        
-        for fmt in date_formats:
+        for fmt in self.date_formats:
             try:
                 dt = datetime.strptime(date_str, fmt)
                 if fmt == '%d/%m':  # Add current year if missing
-                    dt = dt.replace(year=default_year)
+                    dt = dt.replace(year=self.default_year)
                 return dt.strftime('%Y-%m-%d')
             except ValueError:
                 continue
@@ -518,27 +628,22 @@ class TransactionExtractor:
         desc_upper = desc.upper()
         
         # Check payment markers first
-        payment_markers = self.config.get('business_rules.payment_markers', [])
-        if any(marker in desc_upper for marker in payment_markers):
+        if self.payment_pattern and self.payment_pattern.search(desc_upper):
             return 'PAGAMENTO'
         
         # Check adjustment threshold
-        adj_threshold = self.config.get('business_rules.adjustment_threshold', 0.30)
-        if 'AJUSTE' in desc_upper or (0 < abs(amount) <= adj_threshold):
+        if 'AJUSTE' in desc_upper or (0 < abs(amount) <= self.adj_threshold):
             return 'AJUSTE'
         
         # Check IOF and interest
-        iof_keywords = self.config.get('business_rules.iof_keywords', [])
-        interest_keywords = self.config.get('business_rules.interest_keywords', [])
-        
-        if any(kw in desc_upper for kw in iof_keywords + interest_keywords):
+        if self.charges_pattern and self.charges_pattern.search(desc_upper):
             return 'ENCARGOS'
         
         # Check category mappings
-        categories = self.config.get('categories', {})
-        for category, keywords in categories.items():
-            if category != 'DIVERSOS' and any(kw in desc_upper for kw in keywords):
-                return category
+        if self.category_matcher:
+            best = min(self.category_matcher(desc_upper), default=None)
+            if best:
+                return best[1]
         
         # Default fallback
         return 'DIVERSOS'
@@ -555,29 +660,36 @@ class CSVWriter:
         delimiter = self.config.get('schema.delimiter', ';')
         encoding = self.config.get('schema.encoding', 'utf-8')
         
-        with open(output_path, 'w', newline='', encoding=encoding) as f:
-            writer = csv.DictWriter(f, fieldnames=schema, delimiter=delimiter)
-            writer.writeheader()
-            
-            for txn in transactions:
-                row = asdict(txn)
-                # Convert Decimal to string for CSV
-                for key, value in row.items():
-                    if isinstance(value, Decimal):
-                        row[key] = f"{value:.2f}"
-                    elif value is None:
-                        row[key] = ""
-                
-                writer.writerow(row)
+        # 1 MiB buffer: rows reach the OS in a few large writes
+        with open(
+            output_path, 'w', newline='', encoding=encoding, buffering=1 << 20
+        ) as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(schema)
+            writer.writerows(self._row_values(txn, schema) for txn in transactions)
         
         logger.info(f"Wrote {len(transactions)} transactions to {output_path}")
+    
+    @staticmethod
+    def _row_values(txn: Transaction, schema: List[str]) -> List:
+        """Transaction fields in schema order, formatted for CSV."""
+        values = []
+        for key in schema:
+            value = getattr(txn, key, "")
+            # Convert Decimal to string for CSV
+            if isinstance(value, Decimal):
+                value = f"{value:.2f}"
+            elif value is None:
+                value = ""
+            values.append(value)
+        return values
 
 class ItauParser:
     """Main parser class orchestrating the entire pipeline."""
     
-    def __init__(self, config_file: str = CONFIG_FILE):
+    def __init__(self, config_file: str = CONFIG_FILE, workers: Optional[int] = None):
         self.config = ConfigManager(config_file)
-        self.pdf_extractor = PDFExtractor(self.config)
+        self.pdf_extractor = PDFExtractor(self.config, workers)
         self.transaction_extractor = TransactionExtractor(self.config)
         self.csv_writer = CSVWriter(self.config)
     
@@ -611,6 +723,9 @@ def main():
     parser.add_argument("pdf_file", type=Path, help="Input PDF file")
     parser.add_argument("-o", "--output", type=Path, help="Output CSV file")
     parser.add_argument("-c", "--config", type=str, default=CONFIG_FILE, help="Configuration file")
+    parser.add_argument(
+        "-w", "--workers", type=int, help="PDF page processes (1 = serial)"
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
@@ -622,7 +737,7 @@ def main():
     output_path = args.output or args.pdf_file.with_suffix('.csv')
     
     try:
-        parser = ItauParser(args.config)
+        parser = ItauParser(args.config, args.workers)
         transactions = parser.parse_pdf(args.pdf_file, output_path)
         print(f"Successfully parsed {len(transactions)} transactions to {output_path}")
         
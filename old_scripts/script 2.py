@@ -17,15 +17,20 @@ import argparse
 import csv
 import hashlib
 import logging
+import logging.handlers
+import os
 import datetime
 import tracemalloc
 import time
+import queue
 import re
 import sys
 from dataclasses import dataclass, asdict
 from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from datetime import datetime, date
 from typing import List, Tuple, Optional
 
@@ -77,7 +82,14 @@ PREV_BILL_KEYWORDS = ("fatura anterior", "ref.", "refª", "pagt anterior")
 # ──────────────────────────────────────────────────────────────
 # 2. REGEXES  (compiled once – reusable everywhere)
 # ──────────────────────────────────────────────────────────────
+try:  # optional Aho-Corasick automaton: pip install pyahocorasick
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
 RE_DECIMAL = re.compile(r"[^\d,\-]")
+RE_PUA = re.compile(r"[\ue000-\uf8ff]")
 RE_CARD = re.compile(r"final (\d{4})")
 RE_DATE = re.compile(r"(?P<d>\d{1,2})/(?P<m>\d{1,2})(?:/(?P<y>\d{4}))?")
 RE_BRL = re.compile(r"-?\s*\d{1,3}(?:\.\d{3})*,\d{2}")
@@ -101,19 +113,61 @@ RE_FX_L1 = re.compile(
 RE_DOLLAR_RATE = re.compile(r"D[óo]lar de Convers[ãa]o.*?(\d+,\d{4})", re.I)
 # IOF detection
 RE_IOF = re.compile(r"Repasse de IOF", re.I)
+# International city: text before the first number on the FX second line
+RE_CITY_INTL = re.compile(r"([A-Za-zÀ-ÿ\s]+?)\s+\d")
+# Installment marker inside a description: “LOJA 02/05”
+RE_INSTALLMENT = re.compile(r"(\d{1,2})/(\d{1,2})")
+# Statement period from filename: “Itau_2025-05”
+RE_PERIOD = re.compile(r"(20\d{2})[-_]?(\d{2})")
+
+# Category keywords in priority order – the first rule whose keyword occurs wins
+CLASSIFY_RULES: Tuple[Tuple[str, str], ...] = (
+    ("7117", "PAGAMENTO"),
+    ("AJUSTE", "AJUSTE"),
+    ("IOF", "ENCARGOS"), ("JUROS", "ENCARGOS"), ("MULTA", "ENCARGOS"),
+    # mapping based on golden CSV patterns
+    ("FARMAC", "FARMÁCIA"), ("DROG", "FARMÁCIA"),
+    ("SUPERMERC", "SUPERMERCADO"), ("MERCADO", "SUPERMERCADO"),
+    ("RESTAUR", "RESTAURANTE"), ("PIZZ", "RESTAURANTE"), ("BAR", "RESTAURANTE"),
+    ("POSTO", "POSTO"), ("COMBUST", "POSTO"),
+    ("UBER", "TRANSPORTE"), ("TAXI", "TRANSPORTE"),
+    ("HOTEL", "TURISMO"), ("AEROPORTO", "TURISMO"),
+    ("APPLE", "DIVERSOS"), ("DISNEY", "DIVERSOS"), ("NETFLIX", "DIVERSOS"),
+    # FX detection
+    ("USD", "FX"), ("EUR", "FX"), ("FX", "FX"), ("DOLAR", "FX"),
+)
+AJUSTE_LIMIT = Decimal("0.30")
+
+if ahocorasick is not None:
+    # one pass over the description reports every keyword hit with its rank
+    CLASSIFY_AC = ahocorasick.Automaton()
+    for _rank, (_kw, _cat) in enumerate(CLASSIFY_RULES):
+        CLASSIFY_AC.add_word(_kw, (_rank, _cat))
+    CLASSIFY_AC.make_automaton()
+else:
+    CLASSIFY_AC = None
 
 # ──────────────────────────────────────────────────────────────
 # 3. UTILS
 # ──────────────────────────────────────────────────────────────
+Q2 = Decimal("0.01")  # cents quantum, shared instead of rebuilt per call
+
+
 def decomma(x: str | Decimal) -> Decimal:
     "Convert Brazilian number string to Decimal(2) safely."
     if isinstance(x, Decimal):
         return x
     if not x:
         return Decimal("0.00")
-    val = RE_DECIMAL.sub("", x.replace(" ", "")).replace(".", "").replace(",", ".")
+    # fast path: a clean token ("-1.234,56") only needs the separator swap
+    val = x.replace(".", "").replace(",", ".")
+    if not val.lstrip("-").replace(".", "", 1).isdecimal():
+        val = RE_DECIMAL.sub("", x.replace(" ", "")).replace(".", "").replace(",", ".")
     try:
-        return Decimal(val).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        # exactly two decimals ("1234.56") already carry the cents exponent
+        if val[-3:-2] == ".":
+            return Decimal(val)
+        return Decimal(val).quantize(Q2, rounding=ROUND_HALF_UP)
     except Exception:  # pragma: no cover
         return Decimal("0.00")
 
@@ -155,8 +209,10 @@ def norm_date(raw: str, ref_year: int, ref_month: int) -> str:
 
 def clean_line(txt: str) -> str:
     "Strip funky symbols / duplicate spaces."
-    txt = re.sub(r"[\ue000-\uf8ff]", "", txt)  # PUA glyphs
-    txt = re.sub(r"\s{2,}", " ", txt.strip(">•*®«» @_")).strip()
+    if not txt.isascii():  # O(1) flag check – PUA glyphs are never ASCII
+        txt = RE_PUA.sub("", txt)  # PUA glyphs
+    # split()/join collapses whitespace runs and trims both ends in one C pass
+    txt = " ".join(txt.strip(">•*®«» @_").split())
     return txt
 
 
@@ -183,8 +239,7 @@ def extract_merchant_city_international(second_line: str) -> str:
         return ""
     
     # Find city as text before first number
-    import re
-    match = re.match(r"([A-Za-zÀ-ÿ\s]+?)\s+\d", second_line)
+    match = RE_CITY_INTL.match(second_line)
     if match:
         city = match.group(1).strip()
         return city.upper() if city else ""  # Keep uppercase for golden alignment
@@ -193,48 +248,37 @@ def extract_merchant_city_international(second_line: str) -> str:
     words = second_line.split()
     return words[0].upper() if words else ""
 
+def _first_rule(up: str) -> Optional[str]:
+    "Category of the highest-priority CLASSIFY_RULES keyword found in `up`."
+    if CLASSIFY_AC is not None:
+        hit = min((rule for _, rule in CLASSIFY_AC.iter(up)), default=None)
+        return hit[1] if hit else None
+    for kw, cat in CLASSIFY_RULES:
+        if kw in up:
+            return cat
+    return None
+
+
 def classify(desc: str, amt: Decimal) -> str:
     """
     Category assignment to match golden CSV expectations.
     """
-    up = desc.upper()
-    
-    # Priority classifications
-    if "7117" in up:
-        return "PAGAMENTO"
-    if "AJUSTE" in up or (abs(amt) < Decimal("0.30") and abs(amt) > 0):
+    cat = _first_rule(desc.upper())
+
+    # Priority classifications: 7117 beats everything, then tiny amounts
+    if cat == "PAGAMENTO":
+        return cat
+    if 0 < abs(amt) < AJUSTE_LIMIT:
         return "AJUSTE"
-    if any(k in up for k in ("IOF", "JUROS", "MULTA")):
-        return "ENCARGOS"
-    
-    # Category mapping based on golden CSV patterns
-    if "FARMAC" in up or "DROG" in up:
-        return "FARMÁCIA"
-    if "SUPERMERC" in up or "MERCADO" in up:
-        return "SUPERMERCADO"
-    if "RESTAUR" in up or "PIZZ" in up or "BAR" in up:
-        return "RESTAURANTE"
-    if "POSTO" in up or "COMBUST" in up:
-        return "POSTO"
-    if "UBER" in up or "TAXI" in up:
-        return "TRANSPORTE"
-    if "HOTEL" in up or "AEROPORTO" in up:
-        return "TURISMO"
-    if "APPLE" in up or "DISNEY" in up or "NETFLIX" in up:
-        return "DIVERSOS"
-    
-    # FX detection
-    if any(c in up for c in ("USD", "EUR", "FX")) or "DOLAR" in up:
-        return "FX"
-    
+
     # Default fallback
-    return "DIVERSOS"
+    return cat or "DIVERSOS"
 
 
 # ──────────────────────────────────────────────────────────────
 # 4. DATA STRUCTURES
 # ──────────────────────────────────────────────────────────────
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     post_date: str = ""
     card_last4: str = ""
@@ -251,6 +295,7 @@ class Transaction:
     merchant_city: str = ""
     ledger_hash: str = ""
     pagamento_fatura_anterior: str = ""
+    date: str = ""  # raw DD/MM from the statement, normalised into post_date
 
     def finalise(self):
         # Ledger hash uses canonical fields for deduplication
@@ -305,8 +350,16 @@ class Transaction:
 # ──────────────────────────────────────────────────────────────
 # 5. LOADERS
 # ──────────────────────────────────────────────────────────────
-def load_lines(path: Path) -> List[str]:
-    "Return list of cleaned text lines from PDF or TXT."
+def _extract_page_lines(pdf_path: str, page_idx: int) -> List[str]:
+    "Worker: raw text lines of a single PDF page (0-based index)."
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path, pages=[page_idx + 1]) as pdf:
+        return (pdf.pages[0].extract_text() or "").splitlines()
+
+
+def load_lines(path: Path, workers: int | None = None) -> List[str]:
+    "Return list of cleaned text lines from PDF or TXT (`workers` page processes)."
     if path.suffix.lower() == ".pdf":
         try:
             import pdfplumber
@@ -314,9 +367,19 @@ def load_lines(path: Path) -> List[str]:
             sys.exit("pdfplumber missing: pip install pdfplumber")
         out: List[str] = []
         with pdfplumber.open(str(path)) as pdf:
-            for page in pdf.pages:
-                raw = page.extract_text() or ""
-                out.extend(raw.splitlines())
+            n_pages = len(pdf.pages)
+            workers = min(n_pages, workers or os.cpu_count() or 1)
+            if workers <= 1:
+                for page in pdf.pages:
+                    raw = page.extract_text() or ""
+                    page.close()  # drop pdfplumber's per-page object caches
+                    out.extend(raw.splitlines())
+        if workers > 1:
+            # pages are independent and pdfminer is CPU-bound → one process each
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                pages = ex.map(_extract_page_lines, repeat(str(path)), range(n_pages))
+                for page_lines in pages:
+                    out.extend(page_lines)
         return [clean_line(l) for l in out if l.strip()]
     # else TXT
     return [clean_line(l) for l in path.read_text(encoding="utf-8").splitlines() if l]
@@ -382,9 +445,8 @@ def parse_fx_block(lines: List[str], idx: int) -> Tuple[Optional[Transaction], i
         merchant_city=merchant_city,
         ledger_hash="",
         pagamento_fatura_anterior="",
+        date=date_raw,  # raw DD/MM, normalised in the main loop
     )
-    # Store raw date for enrichment
-    t.date = date_raw  # temporary field
     return t, consumed
 
 
@@ -410,9 +472,8 @@ def parse_payment_line(l: str) -> Optional[Transaction]:
         merchant_city="",
         ledger_hash="",
         pagamento_fatura_anterior="",
+        date=date_raw,  # raw DD/MM, normalised in the main loop
     )
-    # Store raw date for enrichment
-    t.date = date_raw  # temporary field
     return t
 
 
@@ -429,13 +490,12 @@ def parse_domestic_line(l: str, next_line: str = "") -> Optional[Transaction]:
     
     # Try to extract installments from description
     ins_seq, ins_tot = "", ""
-    ins_match = re.search(r"(\d{1,2})/(\d{1,2})", desc)
+    ins_match = RE_INSTALLMENT.search(desc)
     if ins_match:
         # Convert to int to remove leading zeros, then back to string
         ins_seq = str(int(ins_match.group(1)))
         ins_tot = str(int(ins_match.group(2)))
     
-    # Add a temporary date field for enrichment
     t = Transaction(
         post_date="",  # filled in main loop
         card_last4="", # filled in main loop
@@ -452,21 +512,20 @@ def parse_domestic_line(l: str, next_line: str = "") -> Optional[Transaction]:
         merchant_city=merchant_city,
         ledger_hash="",
         pagamento_fatura_anterior="",
+        date=date_raw,  # raw DD/MM, normalised in the main loop
     )
-    # Store raw date for enrichment
-    t.date = date_raw  # temporary field
     return t
 
 
 # ──────────────────────────────────────────────────────────────
 # 7. MAIN PARSER LOOP
 # ──────────────────────────────────────────────────────────────
-def parse_statement(path: Path) -> List[Transaction]:
-    lines = load_lines(path)
+def parse_statement(path: Path, workers: int | None = None) -> List[Transaction]:
+    lines = load_lines(path, workers)
     logging.info("Loaded %s cleaned lines from %s", len(lines), path.name)
 
     # crude statement period → filename YYYY-MM fallback
-    period_match = re.search(r"(20\d{2})[-_]?(\d{2})", path.stem)
+    period_match = RE_PERIOD.search(path.stem)
     ref_year, ref_month = (
         (int(period_match.group(1)), int(period_match.group(2)))
         if period_match
@@ -481,13 +540,21 @@ def parse_statement(path: Path) -> List[Transaction]:
     while i < len(lines):
         l = lines[i]
 
-        # card header capture
-        mcard = RE_CARD.search(l)
+        # card header capture (literal probe first – headers are rare)
+        mcard = RE_CARD.search(l) if "final " in l else None
         if mcard:
             card_last4 = mcard.group(1)
             i += 1
             continue
 
+        # every FX/payment/domestic line starts with a DD/MM date; a
+        # first-char digit test plus the memchr-backed '/' probe lets headers
+        # and legal text skip the regexes
+        if not l[:1].isdigit() or "/" not in l:
+            logging.debug("UNMATCHED: %s", l)
+            i += 1
+            continue
+
         # FX block (priority)
         tx, consumed = parse_fx_block(lines, i)
         if tx:
@@ -517,10 +584,7 @@ def parse_statement(path: Path) -> List[Transaction]:
         # enrich & finalise
         tx.card_last4 = card_last4
         # Map date fields to canonical
-        if hasattr(tx, "date"):
-            tx.post_date = norm_date(getattr(tx, "date", ""), ref_year, ref_month)
-        elif hasattr(tx, "post_date"):
-            tx.post_date = norm_date(getattr(tx, "post_date", ""), ref_year, ref_month)
+        tx.post_date = norm_date(tx.date, ref_year, ref_month)
         tx.finalise()
         txs.append(tx)
 
@@ -536,17 +600,63 @@ def parse_statement(path: Path) -> List[Transaction]:
 # 8. CSV WRITER
 # ──────────────────────────────────────────────────────────────
 def write_csv(rows: List[Transaction], out_path: Path):
-    with out_path.open("w", newline="", encoding="utf-8") as fh:
-        w = csv.DictWriter(fh, fieldnames=SCHEMA, delimiter=";")
-        w.writeheader()
-        for t in rows:
-            w.writerow(t.to_csv_row())
+    # 1 MiB buffer → a handful of large write() calls instead of one per 8 KiB
+    with out_path.open("w", newline="", encoding="utf-8", buffering=1 << 20) as fh:
+        w = csv.writer(fh, delimiter=";")
+        w.writerow(SCHEMA)
+        # one C-level writerows call over positional rows – no per-row DictWriter
+        w.writerows([d[k] for k in SCHEMA] for d in (t.to_csv_row() for t in rows))
     logging.info("CSV written: %s (%d KB)", out_path.name, out_path.stat().st_size // 1024)
 
 
 # ──────────────────────────────────────────────────────────────
 # 9. CLI
 # ──────────────────────────────────────────────────────────────
+def _csv_path(path: Path, out_dir: Path) -> Path:
+    "Output path of one statement: <out_dir>/<stem>_parsed.csv."
+    return out_dir / f"{path.stem}_parsed.csv"
+
+
+def parse_to_csv(path: Path, out_dir: Path, workers: int | None = None) -> Path:
+    "Parse one statement into <out_dir>/<stem>_parsed.csv."
+    rows = parse_statement(path, workers)
+    out = _csv_path(path, out_dir)
+    write_csv(rows, out)
+    return out
+
+
+_worker_log: queue.SimpleQueue | None = None
+
+
+def _init_worker_logging(level: int) -> None:
+    "Pool initializer: buffer this worker's log records instead of writing them."
+    global _worker_log
+    _worker_log = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(_worker_log)]
+    root.setLevel(level)
+
+
+def _parse_statement_worker(
+    path: Path,
+) -> Tuple[List[Transaction], List[logging.LogRecord]]:
+    """Pool worker: parse one statement (pages read serially).
+
+    Returns the rows with the log records buffered meanwhile; on failure the
+    records ride along on the exception as ``log_records``.
+    """
+    records: List[logging.LogRecord] = []
+    try:
+        rows = parse_statement(path, workers=1)
+    except Exception as exc:
+        exc.log_records = records  # filled by the finally below before pickling
+        raise
+    finally:
+        while not _worker_log.empty():
+            records.append(_worker_log.get_nowait())
+    return rows, records
+
+
 def cli(argv: List[str] | None = None):
     p = argparse.ArgumentParser(
         description="Unified Itaú PDF/TXT → CSV parser (golden-ready)"
@@ -561,10 +671,31 @@ def cli(argv: List[str] | None = None):
     )
     args.out_dir.mkdir(parents=True, exist_ok=True)
 
-    for f in args.files:
-        rows = parse_statement(f)
-        out = args.out_dir / f"{f.stem}_parsed.csv"
-        write_csv(rows, out)
+    workers = min(len(args.files), os.cpu_count() or 1)
+    if workers <= 1:
+        for f in args.files:
+            parse_to_csv(f, args.out_dir)
+        return
+    # statements are independent → one process per file, pages stay serial
+    # inside each so the pools don't nest; log records are replayed and CSVs
+    # written here in file order, so output matches the serial loop and the
+    # first failing file stops the run before any later CSV is written
+    root = logging.getLogger()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker_logging, initargs=(root.level,)
+    ) as ex:
+        futures = [ex.submit(_parse_statement_worker, f) for f in args.files]
+        for f, fut in zip(args.files, futures, strict=True):
+            try:
+                rows, records = fut.result()
+            except Exception as exc:
+                for record in getattr(exc, "log_records", ()):
+                    root.handle(record)
+                ex.shutdown(cancel_futures=True)
+                raise
+            for record in records:
+                root.handle(record)
+            write_csv(rows, _csv_path(f, args.out_dir))
 
 
 if __name__ == "__main__":
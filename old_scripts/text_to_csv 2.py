@@ -2,20 +2,19 @@ import re
 from decimal import Decimal
 from typing import Optional
 
+# Basic patterns: "DD/MM <description> <amount>" and "final NNNN"
+TRANSACTION_RE = re.compile(r'(\d{2}/\d{2})\s+(.+?)\s+([\d.,]+)$')
+CARD_RE = re.compile(r'final (\d{4})')
+
 def parse_statement_line(line: str) -> Optional[dict]:
-    # Basic patterns
-    date_pattern = r'(\d{2}/\d{2})'
-    amount_pattern = r'([\d.,]+)'
-    card_pattern = r'final (\d{4})'
-    
     # Try to match a transaction line
-    transaction = re.match(f'{date_pattern}\\s+(.+?)\\s+{amount_pattern}$', line)
+    transaction = TRANSACTION_RE.match(line)
     if transaction:
         date, description, amount = transaction.groups()
         amount = Decimal(amount.replace('.', '').replace(',', '.'))
         
         # Try to find card number
-        card_match = re.search(card_pattern, description)
+        card_match = CARD_RE.search(description)
         card_last4 = card_match.group(1) if card_match else '0000'
         
         return {
@@ -27,4 +26,3 @@ def parse_statement_line(line: str) -> Optional[dict]:
         }
     
     return None  # Return None if line doesn't match expected format
-